@@ -8,6 +8,7 @@
 """
 
 import struct  # 用于二进制数据解析
+import threading  # 用于获取线程标识
 import time    # 用于时间戳生成
 from PyQt5.QtCore import pyqtSignal, QObject, QThread, QMutex
 
@@ -23,14 +24,23 @@ class DataProcessThread(QThread):
         super().__init__(parent)
         self.processor = processor
         self.running = True
+        self.thread_ident = None  # Python 线程标识，供采样分析使用
+        self.profile_hook = None  # 诊断钩子，在本线程内执行，返回 False 时移除
     
     def run(self):
         """线程运行函数"""
+        self.thread_ident = threading.get_ident()
         while self.running:
+            if self.profile_hook and not self.profile_hook():
+                self.profile_hook = None
             # 处理队列中的数据
             self.processor.process_queue()
             # 短暂休眠，减少CPU占用
             self.msleep(30)
+        # 退出前再执行一次诊断钩子，保存尚未落盘的分析结果
+        if self.profile_hook:
+            self.profile_hook()
+            self.profile_hook = None
     
     def stop(self):
         """停止线程"""
@@ -0,0 +1,282 @@
+"""
+运行时诊断工具 - 用于定位吞吐下降和内存增长
+功能：
+1. 线程级性能分析 - 对处理线程或界面线程启停 cProfile 或采样分析
+2. 内存分配跟踪 - 使用 tracemalloc 拍摄快照并与上一次快照对比
+3. 结果落盘 - 分析结果保存到文件，便于事后查看
+关闭时不安装任何钩子，不产生额外开销
+"""
+
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from PyQt5.QtCore import pyqtSignal, QObject
+
+
+class ThreadProfiler:
+    """
+    cProfile 分析器
+    cProfile 只统计调用 enable 的线程，因此启停操作需由目标线程调用 poll 完成
+    """
+
+    def __init__(self, target, path, on_done):
+        """
+        :param target: 目标名称
+        :param path: 结果文件路径
+        :param on_done: 结果保存完成或启动失败时的回调，在目标线程中调用，参数为本分析器
+        """
+        self.target = target
+        self.path = path
+        self.on_done = on_done
+        self.profile = None
+        self.running = True  # 期望状态，由控制方修改，目标线程在 poll 中执行
+        self.error = None
+        self.dumped = False  # 结果是否已保存
+
+    def poll(self) -> bool:
+        """
+        在目标线程中调用，按期望状态启停分析
+        :return: 是否仍需继续调用
+        """
+        if self.running and self.profile is None:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError as e:  # 已有其他分析器处于激活状态
+                self.error = str(e)
+                self.running = False
+                self.on_done(self)
+                return False
+            self.profile = profile
+        elif not self.running and self.profile is None:
+            # 尚未开始即被停止，没有可保存的数据
+            self.on_done(self)
+            return False
+        elif not self.running:
+            self.profile.disable()
+            self.profile.dump_stats(self.path)
+            # 同时输出可直接阅读的文本报告
+            with open(self.path + '.txt', 'w', encoding='utf-8') as f:
+                pstats.Stats(self.path, stream=f).sort_stats('cumulative').print_stats(50)
+            self.profile = None
+            self.dumped = True
+            self.on_done(self)
+        return self.profile is not None or self.running
+
+
+class StackSampler(threading.Thread):
+    """采样分析器，定期采集目标线程的调用栈，无需在目标线程内执行任何操作"""
+
+    def __init__(self, thread_ident, path, interval=0.005):
+        """
+        :param thread_ident: 目标线程标识(threading.get_ident)
+        :param path: 结果文件路径
+        :param interval: 采样间隔(秒)
+        """
+        super().__init__(daemon=True)
+        self.thread_ident = thread_ident
+        self.path = path
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        """线程运行函数"""
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_ident)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self):
+        """停止采样并保存结果"""
+        self._stop_event.set()
+        self.join()
+        # 折叠栈格式，可直接用于 flamegraph.pl / speedscope
+        with open(self.path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        # 按函数统计自身耗时占比(栈顶)
+        leaf = Counter()
+        for stack, count in self.stacks.items():
+            leaf[stack.rsplit(';', 1)[-1]] += count
+        with open(self.path + '.txt', 'w', encoding='utf-8') as f:
+            f.write(f"采样数: {self.samples} 间隔: {self.interval * 1000:.1f}ms\n")
+            for func, count in leaf.most_common(50):
+                f.write(f"{count / max(self.samples, 1):7.2%}  {count:6d}  {func}\n")
+
+
+class Diagnostics(QObject):
+    """
+    诊断工具入口
+    继承自QObject以支持Qt信号机制
+    """
+    msg_signal = pyqtSignal(str)  # 诊断结果信号，发送结果说明及文件路径
+    profile_failed = pyqtSignal(str, str)  # 性能分析启动失败信号，发送目标名称和分析模式
+    _profile_done = pyqtSignal(object)  # 内部信号，cProfile 分析器在目标线程中完成后排队回到本线程
+
+    def __init__(self, output_dir='diagnostics', parent=None):
+        """
+        初始化诊断工具
+        :param output_dir: 结果文件保存目录
+        """
+        super().__init__(parent)
+        self.output_dir = output_dir
+        self._threads = {'gui': None}  # {目标名称: 线程对象}，None 表示界面线程
+        self._profilers = {}  # {(目标名称, 模式): 分析器}
+        self._last_snapshot = None
+        self._file_count = 0  # 结果文件序号，避免同一秒内文件名重复
+        self._profile_done.connect(self._on_profile_done)
+
+    def register_thread(self, target, thread):
+        """
+        注册可分析的线程
+        :param target: 目标名称
+        :param thread: 线程对象，需提供 thread_ident 和 profile_hook 属性
+        """
+        self._threads[target] = thread
+
+    def set_profile(self, target, mode, enabled):
+        """
+        启动或停止性能分析
+        :param target: 目标名称，'gui' 或已注册的线程名称
+        :param mode: 'cprofile' 或 'sample'
+        :param enabled: True 启动，False 停止并保存结果
+        """
+        if enabled:
+            self.start_profile(target, mode)
+        else:
+            self.stop_profile(target, mode)
+
+    def start_profile(self, target, mode='cprofile'):
+        """启动性能分析"""
+        key = (target, mode)
+        if key in self._profilers or target not in self._threads:
+            return
+        thread = self._threads[target]
+        suffix = 'prof' if mode == 'cprofile' else 'folded'
+        path = self._output_path(f"{target}_{mode}", suffix)
+
+        if mode == 'cprofile':
+            if thread is not None and thread.profile_hook is not None:
+                # 上一次分析尚未在目标线程中保存，覆盖钩子会丢失其结果
+                self.msg_signal.emit(f"{target}线程上一次性能分析结果尚未保存，请稍后重试\n")
+                self.profile_failed.emit(target, mode)
+                return
+            profiler = ThreadProfiler(target, path, self._profile_done.emit)
+            self._profilers[key] = profiler
+            if thread is None:
+                profiler.poll()
+            else:
+                # 启动失败时由 poll 通过 _profile_done 异步报告
+                thread.profile_hook = profiler.poll
+            if key in self._profilers:
+                self.msg_signal.emit(f"已开始{target}线程{mode}性能分析\n")
+            return
+
+        ident = threading.main_thread().ident if thread is None else thread.thread_ident
+        profiler = StackSampler(ident, path)
+        profiler.start()
+        self._profilers[key] = profiler
+        self.msg_signal.emit(f"已开始{target}线程{mode}性能分析\n")
+
+    def stop_profile(self, target, mode='cprofile'):
+        """停止性能分析并保存结果"""
+        profiler = self._profilers.pop((target, mode), None)
+        if profiler is None:
+            return
+        if mode == 'cprofile':
+            profiler.running = False
+            thread = self._threads[target]
+            if thread is None:
+                profiler.poll()
+            elif not thread.isRunning():
+                # 目标线程已退出，不会再调用钩子，在此直接保存
+                thread.profile_hook = None
+                profiler.poll()
+            # 其他线程在下一次 poll 时保存结果，并通过 _profile_done 报告
+            return
+        profiler.stop()
+        self.msg_signal.emit(f"{target}线程{mode}性能分析结果: {os.path.abspath(profiler.path)}\n")
+
+    def _on_profile_done(self, profiler):
+        """cProfile 分析器保存结果或启动失败后的处理，始终在本对象所在线程执行"""
+        if profiler.error:
+            key = (profiler.target, 'cprofile')
+            if self._profilers.get(key) is profiler:
+                del self._profilers[key]
+            self.msg_signal.emit(f"性能分析启动失败: {profiler.error}\n")
+            self.profile_failed.emit(*key)
+            return
+        if not profiler.dumped:
+            self.msg_signal.emit(f"{profiler.target}线程cprofile性能分析已停止，未采集到数据\n")
+            return
+        self.msg_signal.emit(f"{profiler.target}线程cprofile性能分析结果: {os.path.abspath(profiler.path)}\n")
+
+    def take_snapshot(self, limit=20):
+        """
+        拍摄内存快照，首次调用时开始跟踪，之后与上一次快照对比输出增长最多的分配位置
+        :param limit: 输出的分配位置数量
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+            self._last_snapshot = self._filtered_snapshot()
+            self.msg_signal.emit("已开始内存分配跟踪，再次拍摄快照即可对比\n")
+            return
+
+        snapshot = self._filtered_snapshot()
+        path = self._output_path('tracemalloc', 'snapshot')
+        # 原始快照可用 tracemalloc.Snapshot.load 载入分析
+        snapshot.dump(path)
+        stats = snapshot.compare_to(self._last_snapshot, 'lineno')
+        with open(path + '.txt', 'w', encoding='utf-8') as f:
+            current, peak = tracemalloc.get_traced_memory()
+            f.write(f"当前: {current / 1024:.1f} KiB 峰值: {peak / 1024:.1f} KiB\n")
+            for stat in stats[:limit]:
+                f.write(f"{stat}\n")
+        self._last_snapshot = snapshot
+
+        top = '\n'.join(str(stat) for stat in stats[:5])
+        self.msg_signal.emit(f"内存分配增长前5位:\n{top}\n完整结果: {os.path.abspath(path)}.txt\n")
+
+    def stop_tracemalloc(self):
+        """停止内存分配跟踪"""
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+            self._last_snapshot = None
+            self.msg_signal.emit("已停止内存分配跟踪\n")
+
+    def close(self):
+        """停止所有分析并保存结果"""
+        for target, mode in list(self._profilers):
+            self.stop_profile(target, mode)
+        self.stop_tracemalloc()
+
+    @staticmethod
+    def _filtered_snapshot():
+        """拍摄快照并排除 tracemalloc 自身、导入机制及来源未知的分配"""
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+
+    def _output_path(self, name, suffix) -> str:
+        """生成带时间戳的结果文件路径"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._file_count += 1
+        return os.path.join(self.output_dir,
+                            f"{name}_{time.strftime('%Y%m%d_%H%M%S')}_{self._file_count:03d}.{suffix}")
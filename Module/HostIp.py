@@ -0,0 +1,52 @@
+"""
+本机地址获取 - 独立于 TCP 模块，界面启动时无需导入网络收发逻辑
+"""
+
+import socket
+from PyQt5.QtCore import pyqtSignal, QThread
+from PyQt5.QtNetwork import QAbstractSocket, QNetworkInterface
+
+
+def get_host_ip(ips=None) -> str:
+    """
+    获取本机IP地址，无网络时退回到本机网卡地址或 127.0.0.1
+    :param ips: 已获取的网卡地址列表，为 None 时重新获取
+    """
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        # UDP connect 不发送数据，仅用于确定默认路由对应的网卡地址
+        s.connect(("8.8.8.8", 80))
+        return s.getsockname()[0]
+    except OSError:
+        if ips is None:
+            ips = get_all_host_ips()
+        return ips[0] if ips else "127.0.0.1"
+    finally:
+        s.close()
+
+
+def get_all_host_ips() -> list:
+    """获取所有已启用网卡的 IPv4 地址(不含回环地址)"""
+    ips = []
+    for interface in QNetworkInterface.allInterfaces():
+        flags = interface.flags()
+        if not (flags & QNetworkInterface.IsUp) or flags & QNetworkInterface.IsLoopBack:
+            continue
+        for entry in interface.addressEntries():
+            address = entry.ip()
+            if address.protocol() == QAbstractSocket.IPv4Protocol:
+                ips.append(address.toString())
+    return ips
+
+
+class HostIpThread(QThread):
+    """后台获取本机IP地址的线程，避免阻塞界面启动"""
+    ip_signal = pyqtSignal(str, list)  # 首选IP，全部网卡IP列表
+
+    def run(self):
+        """线程运行函数"""
+        ips = get_all_host_ips()
+        primary = get_host_ip(ips)
+        if primary not in ips:
+            ips.insert(0, primary)
+        self.ip_signal.emit(primary, ips)
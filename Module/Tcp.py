@@ -1,20 +1,9 @@
-import socket
-from PyQt5.QtCore import pyqtSignal, QObject, QByteArray
+import time
+from PyQt5.QtCore import pyqtSignal, QObject, QByteArray, QTimer
 from PyQt5.QtNetwork import QTcpServer, QTcpSocket, QHostAddress, QAbstractSocket
 
 
 
-def get_host_ip() -> str:
-    """获取本机IP地址"""
-    try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.connect(("8.8.8.8", 80))
-        ip = s.getsockname()[0]
-    finally:
-        s.close()
-    return ip
-
-
 class TcpLogic(QObject):
     tcp_signal_msg = pyqtSignal(str)
     tcp_signal_data = pyqtSignal(str, bytes)
@@ -27,18 +16,70 @@ class TcpLogic(QObject):
         self.link_flag = self.NoLink  # 用于标记是否开启了连接
         self.sever_th = None
         self.client_th = None  # 保留兼容性
-        
 
+        # 服务端连接管理配置
+        self._server_config = {
+            'max_clients': 0,          # 最大客户端数，0 表示不限制
+            'accept_rate': 0,          # 每秒最多接受的连接数，0 表示不限制
+            'idle_timeout': 0,         # 空闲超时(秒)，超时未收到数据则断开，0 表示不回收
+            'read_buffer_size': 0,     # 每个连接的接收缓冲区大小(字节)，0 表示保持内核及Qt默认值
+            'no_delay': True,          # 是否启用 TCP_NODELAY
+            'keep_alive': True,        # 是否启用 TCP keepalive
+            'log_interval': 500,       # 连接/断开日志合并间隔(毫秒)
+        }
+        self._last_active = {}  # {client_socket: 最近一次收到数据的时间}
+        self._accept_window = [0.0, 0]  # [限速窗口起始时间, 窗口内已接受连接数]
+        self._log_pending = {'connected': [], 'disconnected': [], 'rejected': 0, 'reaped': 0}
+
+        # 合并日志定时器，首个事件触发后延时一次性输出
+        self._log_timer = QTimer(self)
+        self._log_timer.setSingleShot(True)
+        self._log_timer.timeout.connect(self._flush_conn_log)
+
+        # 限速恢复定时器，暂停接受连接后到时继续处理积压连接
+        self._accept_timer = QTimer(self)
+        self._accept_timer.setSingleShot(True)
+        self._accept_timer.timeout.connect(self._resume_accepting)
+
+        # 空闲连接回收定时器
+        self._reap_timer = QTimer(self)
+        self._reap_timer.timeout.connect(self._reap_idle_clients)
+
+    def set_server_config(self, max_clients=0, accept_rate=0, idle_timeout=0,
+                          read_buffer_size=0, no_delay=True, keep_alive=True,
+                          log_interval=500):
+        """
+        设置服务端连接管理参数，需在 tcp_server_start 之前调用
+        :param max_clients: 最大客户端数，超出的新连接将被直接断开，0 表示不限制
+        :param accept_rate: 每秒最多接受的连接数，超出部分留在监听队列中稍后处理，0 表示不限制
+        :param idle_timeout: 空闲超时(秒)，超过该时间未发送数据的连接将被断开，0 表示不回收
+        :param read_buffer_size: 每个连接的接收缓冲区大小(字节)，0 表示保持内核及Qt默认值
+                                 (Linux 下设置 SO_RCVBUF 会关闭接收缓冲区自动调节，仅在需要时设置)
+        :param no_delay: 是否启用 TCP_NODELAY
+        :param keep_alive: 是否启用 TCP keepalive
+        :param log_interval: 连接/断开日志合并间隔(毫秒)
+        """
+        self._server_config.update(max_clients=max_clients, accept_rate=accept_rate,
+                                   idle_timeout=idle_timeout, read_buffer_size=read_buffer_size,
+                                   no_delay=no_delay, keep_alive=keep_alive,
+                                   log_interval=log_interval)
 
     def tcp_server_start(self, port: int) -> None:
         """
         功能函数，TCP服务端开启的方法
         """
         self.tcp_server = QTcpServer(self)
+        # 默认只缓存30个待处理连接，重连风暴时放宽，其余留在内核监听队列
+        self.tcp_server.setMaxPendingConnections(1024)
         self.tcp_server.newConnection.connect(self._handle_new_connection)
 
         if self.tcp_server.listen(QHostAddress.AnyIPv4, port):
             self.link_flag = self.ServerTCP
+            self._accept_window = [time.monotonic(), 0]
+            if self._server_config['idle_timeout'] > 0:
+                # 检查周期取超时时间的一半，且不小于1秒
+                interval = max(1000, int(self._server_config['idle_timeout'] * 500))
+                self._reap_timer.start(interval)
             msg = f"TCP服务端正在监听端口:{port}\n"
             print(msg)
             self.tcp_signal_msg.emit(msg)
@@ -47,17 +88,119 @@ class TcpLogic(QObject):
             self.tcp_signal_msg.emit(msg)
 
     def _handle_new_connection(self):
-        """处理新的客户端连接"""
-        client_socket = self.tcp_server.nextPendingConnection()
-        if client_socket:
-            client_socket.readyRead.connect(lambda: self._read_data(client_socket))
-            client_socket.disconnected.connect(lambda: self._handle_disconnect(client_socket))
+        """处理新的客户端连接，一次取出所有待处理连接"""
+        while self.tcp_server and self.tcp_server.hasPendingConnections():
+            max_clients = self._server_config['max_clients']
+            full = max_clients and len(self.client_socket_list) >= max_clients
+            # 满员时直接拒绝，被拒绝的连接不占用限速配额
+            if not full and not self._accept_allowed():
+                return
+            client_socket = self.tcp_server.nextPendingConnection()
+            if not client_socket:
+                break
+
+            if full:
+                # 超出最大连接数，直接断开
+                client_socket.abort()
+                client_socket.deleteLater()
+                self._log_pending['rejected'] += 1
+                self._schedule_conn_log()
+                continue
+
+            self._apply_socket_options(client_socket)
+            client_socket.readyRead.connect(lambda s=client_socket: self._read_data(s))
+            client_socket.disconnected.connect(lambda s=client_socket: self._handle_disconnect(s))
 
             client_address = (client_socket.peerAddress().toString(), client_socket.peerPort())
             self.client_socket_list.append((client_socket, client_address))
+            self._last_active[client_socket] = time.monotonic()
 
-            msg = f"TCP服务端已连接{client_address[0]}:{client_address[1]}\n"
-            self.tcp_signal_msg.emit(msg)
+            self._log_pending['connected'].append(client_address)
+            self._schedule_conn_log()
+
+    def _accept_allowed(self) -> bool:
+        """
+        检查当前是否允许接受新连接，超出速率限制时暂停监听并在窗口结束后恢复
+        :return: 是否允许接受
+        """
+        accept_rate = self._server_config['accept_rate']
+        if not accept_rate:
+            return True
+
+        now = time.monotonic()
+        if now - self._accept_window[0] >= 1.0:
+            self._accept_window = [now, 0]
+        if self._accept_window[1] < accept_rate:
+            self._accept_window[1] += 1
+            return True
+
+        # 本窗口配额已用完，剩余连接留待下个窗口
+        self.tcp_server.pauseAccepting()
+        remaining = 1.0 - (now - self._accept_window[0])
+        self._accept_timer.start(max(1, int(remaining * 1000)))
+        return False
+
+    def _resume_accepting(self):
+        """限速窗口结束，恢复监听并继续处理积压连接"""
+        if self.tcp_server:
+            self.tcp_server.resumeAccepting()
+            self._handle_new_connection()
+
+    def _apply_socket_options(self, client_socket):
+        """
+        为新连接设置套接字参数
+        :param client_socket: 客户端套接字
+        """
+        config = self._server_config
+        client_socket.setSocketOption(QAbstractSocket.LowDelayOption, 1 if config['no_delay'] else 0)
+        client_socket.setSocketOption(QAbstractSocket.KeepAliveOption, 1 if config['keep_alive'] else 0)
+        if config['read_buffer_size']:
+            client_socket.setReadBufferSize(config['read_buffer_size'])
+            client_socket.setSocketOption(QAbstractSocket.ReceiveBufferSizeSocketOption,
+                                          config['read_buffer_size'])
+
+    def _schedule_conn_log(self):
+        """登记一次连接事件，在合并间隔结束后统一输出日志"""
+        if not self._log_timer.isActive():
+            self._log_timer.start(self._server_config['log_interval'])
+
+    def _flush_conn_log(self):
+        """输出合并后的连接/断开日志，事件较少时逐条输出，较多时输出汇总"""
+        pending = self._log_pending
+        self._log_pending = {'connected': [], 'disconnected': [], 'rejected': 0, 'reaped': 0}
+
+        lines = []
+        for key, fmt, summary in (
+                ('connected', "TCP服务端已连接{0}:{1}", "TCP服务端新连接{0}个"),
+                ('disconnected', "客户端断开连接 IP:{0}端口:{1}", "客户端断开连接{0}个")):
+            addresses = pending[key]
+            if len(addresses) > 3:
+                lines.append(summary.format(len(addresses)) + f"(如 {addresses[0][0]}:{addresses[0][1]})")
+            else:
+                lines.extend(fmt.format(*address) for address in addresses)
+        if pending['rejected']:
+            lines.append(f"超出最大连接数，已拒绝{pending['rejected']}个连接")
+        if pending['reaped']:
+            lines.append(f"已回收{pending['reaped']}个空闲连接")
+
+        if lines:
+            lines.append(f"当前连接数:{len(self.client_socket_list)}")
+            self.tcp_signal_msg.emit('\n'.join(lines) + '\n')
+
+    def _reap_idle_clients(self):
+        """断开超过空闲超时时间未发送数据的客户端"""
+        idle_timeout = self._server_config['idle_timeout']
+        if not idle_timeout:
+            return
+        deadline = time.monotonic() - idle_timeout
+        for client, _ in list(self.client_socket_list):
+            if self._last_active.get(client, 0) < deadline:
+                # 先移出活跃记录，_handle_disconnect 据此不再重复计入断开日志
+                self._last_active.pop(client, None)
+                self._log_pending['reaped'] += 1
+                self._schedule_conn_log()
+                # abort 会触发 disconnected 信号，由 _handle_disconnect 完成清理
+                client.abort()
 
     def _read_data(self, client_socket):
         """读取客户端发送的数据"""
@@ -65,6 +208,7 @@ class TcpLogic(QObject):
             if client == client_socket:
                 data = client.readAll()
                 if data:
+                    self._last_active[client] = time.monotonic()
                     # 通过信号发送数据，而不是直接调用方法
                     client_id = f"{address[0]}:{address[1]}"
                     self.tcp_signal_data.emit(client_id, bytes(data))
@@ -76,8 +220,10 @@ class TcpLogic(QObject):
             if client == client_socket:
                 self.client_socket_list.remove((client, address))
                 client.deleteLater()
-                msg = f"客户端断开连接 IP:{address[0]}端口:{address[1]}\n"
-                self.tcp_signal_msg.emit(msg)
+                # 被回收的空闲连接已计入 reaped，不再计入断开
+                if self._last_active.pop(client, None) is not None:
+                    self._log_pending['disconnected'].append(address)
+                    self._schedule_conn_log()
                 break
 
     def tcp_client_start(self, ip, port):
@@ -137,12 +283,17 @@ class TcpLogic(QObject):
         功能函数，关闭网络连接的方法
         """
         if self.link_flag == self.ServerTCP:
-            # 关闭所有客户端连接
-            for client, _ in self.client_socket_list:
+            # 关闭所有客户端连接，close 会同步触发 disconnected，需遍历副本
+            for client, _ in list(self.client_socket_list):
                 client.close()
                 client.deleteLater()
 
             self.client_socket_list = []
+            self._last_active = {}
+            self._reap_timer.stop()
+            self._accept_timer.stop()
+            self._log_timer.stop()
+            self._log_pending = {'connected': [], 'disconnected': [], 'rejected': 0, 'reaped': 0}
 
             # 关闭服务器
             if self.tcp_server:
@@ -1,15 +1,20 @@
-import numpy as np
-from PyQt5.QtCore import pyqtSignal, QTimer
+from PyQt5.QtCore import pyqtSignal, QTimer, Qt
+from PyQt5.QtGui import QPalette
 from PyQt5.QtWidgets import QMainWindow, QMessageBox
-from Module.Tcp import get_host_ip
+from Module.HostIp import HostIpThread
 from UI import MainWindowUI
-import pyqtgraph as pg
+
+# numpy 与 pyqtgraph 导入耗时较长，推迟到 _init_plot 中首次绘图时导入
+np = None
+pg = None
 
 
 class MainWindowLogic(QMainWindow):
     link_signal = pyqtSignal(int)  # 仅保留服务端信号
     disconnect_signal = pyqtSignal()
     counter_signal = pyqtSignal(int, int)
+    profile_signal = pyqtSignal(str, str, bool)  # 目标线程，分析模式，启动/停止
+    snapshot_signal = pyqtSignal(bool)  # True 拍摄内存快照，False 停止内存跟踪
 
     def __init__(self, parent=None):
         # 通过super调用父类构造函数，创建QWidget窗体，这样self就是一个窗体对象了
@@ -20,16 +25,18 @@ class MainWindowLogic(QMainWindow):
         # 创建UI对象，私有属性__ui包含了可视化设计的UI窗体上的所有组件，所以只有通过
         # self.__ui才可以访问窗体上的组件，包括调用setupUi函数
         # 而__ui是私有属性，在类外部创建对象，是无法通过对象访问窗体上的组件的，为了访问组件，可以定义接口，实现功能
-        # 需要在定义组件之前
-        pg.setConfigOptions(
-            useOpenGL=True,
-            antialias=False,
-            enableExperimental=False,
-            background='w',
-            foreground='k'
-        )
         self.__ui.setupUi(self)
-        self.__ui.lineEdit_myIP.setText(get_host_ip())  # 显示本机IP地址
+        # 绘图控件推迟到首次绘图时创建，此前占位控件显示为白色背景
+        palette = self.__ui.widget_plot.palette()
+        palette.setColor(QPalette.Window, Qt.white)
+        self.__ui.widget_plot.setPalette(palette)
+        self.__ui.widget_plot.setAutoFillBackground(True)
+
+        # 后台获取本机IP地址，避免无网络时阻塞或启动失败
+        self.__ui.lineEdit_myIP.setText("127.0.0.1")
+        self.host_ip_thread = HostIpThread(self)
+        self.host_ip_thread.ip_signal.connect(self._show_host_ip)
+        self.host_ip_thread.start()
 
         self.receive_show_flag = True
         self.ReceiveCounter = 0
@@ -41,9 +48,67 @@ class MainWindowLogic(QMainWindow):
         self.max_points = 1000  # 显示点数
         self.waveform_data = {}  # {client_id: {'curve', 'x', 'y'}}
         self.plot_row = 0
-
+        self.plot_ready = False  # 绘图及OpenGL配置推迟到收到第一组波形数据时
+
+        self._init_diagnostics_menu()
+
+    def _init_diagnostics_menu(self):
+        """创建诊断菜单，性能分析为可勾选项，勾选启动，取消勾选停止并保存结果"""
+        menu = self.menuBar().addMenu("诊断")
+        self.profile_actions = {}  # {(目标线程, 分析模式): 菜单项}
+        for target, target_name in (('process', "处理线程"), ('gui', "界面线程")):
+            for mode, mode_name in (('cprofile', "cProfile"), ('sample', "采样分析")):
+                action = menu.addAction(f"{target_name} {mode_name}")
+                action.setCheckable(True)
+                self.profile_actions[(target, mode)] = action
+                action.toggled.connect(
+                    lambda state, t=target, m=mode: self.profile_signal.emit(t, m, state))
+        menu.addSeparator()
+        menu.addAction("内存快照对比").triggered.connect(lambda: self.snapshot_signal.emit(True))
+        menu.addAction("停止内存跟踪").triggered.connect(lambda: self.snapshot_signal.emit(False))
+
+    def uncheck_profile_action(self, target: str, mode: str):
+        """性能分析启动失败时取消勾选对应菜单项，不再发出停止信号"""
+        action = self.profile_actions[(target, mode)]
+        action.blockSignals(True)
+        action.setChecked(False)
+        action.blockSignals(False)
+
+    def _show_host_ip(self, primary: str, ips: list):
+        """显示本机IP地址，多网卡时在提示中列出全部地址"""
+        self.__ui.lineEdit_myIP.setText(primary)
+        self.__ui.lineEdit_myIP.setToolTip('\n'.join(ips))
+
+    def _init_plot(self):
+        """首次绘制波形前导入绘图库、创建绘图控件并启用硬件加速"""
+        global np, pg
+        import numpy
+        import pyqtgraph
+        np, pg = numpy, pyqtgraph
+
+        # 需要在创建绘图控件之前设置
+        pg.setConfigOptions(
+            useOpenGL=True,
+            antialias=False,
+            enableExperimental=False,
+            background='w',
+            foreground='k'
+        )
+        self.__ui.graphicsView_plot = pg.GraphicsLayoutWidget(self.__ui.widget_plot)
+        self.__ui.graphicsView_plot.setObjectName("graphicsView_plot")
+        self.__ui.verticalLayout_plot.addWidget(self.__ui.graphicsView_plot)
         # 启用硬件加速
         self.__ui.graphicsView_plot.useOpenGL()
+        self.plot_ready = True
+
+    def closeEvent(self, event):
+        """关闭窗口前等待IP获取线程结束，避免销毁运行中的线程"""
+        self.host_ip_thread.wait()
+        super().closeEvent(event)
+
+    def start_listening(self):
+        """以当前端口启动监听，等同于点击连接按钮"""
+        self.__ui.pushButton_connect.setChecked(True)
 
     def connect_button_toggled_handler(self, state):
         if state:
@@ -84,6 +149,8 @@ class MainWindowLogic(QMainWindow):
 
     def update_waveform(self, client_id: str, batch: list):
         """更新指定客户端的波形"""
+        if not self.plot_ready:
+            self._init_plot()
         if client_id not in self.waveform_data:
             self._init_client_plot(client_id)
 
@@ -127,13 +194,16 @@ class MainWindowLogic(QMainWindow):
         }
 
     @staticmethod
-    def _gen_color(client_id) -> pg.mkPen:
-        """生成客户端唯一颜色"""
+    def _gen_color(client_id):
+        """生成客户端唯一颜色，仅在 _init_plot 导入 pyqtgraph 之后调用"""
         return pg.mkColor(hash(client_id) % 0xFFFFFF | 0xFF000000)
 
     def clear_all_waveforms(self):
         """安全清空所有波形数据"""
-        # 加锁防止数据竞争
+        if not self.plot_ready:
+            # 尚未绘制过波形，绘图控件还未创建
+            self.statusBar().showMessage("已清除所有波形数据", 3000)
+            return
 
         for client_id in list(self.waveform_data.keys()):
             item = self.waveform_data[client_id]['plot']
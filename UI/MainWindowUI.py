@@ -74,9 +74,12 @@ class Ui_MainWindow(object):
         self.pushButton_connect_5 = QtWidgets.QPushButton(self.tab)
         self.pushButton_connect_5.setObjectName("pushButton_connect_5")
         self.gridLayout_3.addWidget(self.pushButton_connect_5, 1, 3, 1, 1)
-        self.graphicsView_plot = GraphicsLayoutWidget(self.tab)
-        self.graphicsView_plot.setObjectName("graphicsView_plot")
-        self.gridLayout_3.addWidget(self.graphicsView_plot, 0, 0, 1, 4)
+        self.widget_plot = QtWidgets.QWidget(self.tab)
+        self.widget_plot.setObjectName("widget_plot")
+        self.verticalLayout_plot = QtWidgets.QVBoxLayout(self.widget_plot)
+        self.verticalLayout_plot.setContentsMargins(0, 0, 0, 0)
+        self.verticalLayout_plot.setObjectName("verticalLayout_plot")
+        self.gridLayout_3.addWidget(self.widget_plot, 0, 0, 1, 4)
         self.tabWidget.addTab(self.tab, "")
         self.tab_2 = QtWidgets.QWidget()
         self.tab_2.setObjectName("tab_2")
@@ -112,4 +115,3 @@ class Ui_MainWindow(object):
         self.tabWidget.setTabText(self.tabWidget.indexOf(self.tab), _translate("MainWindow", "波形绘制"))
         self.tabWidget.setTabText(self.tabWidget.indexOf(self.tab_2), _translate("MainWindow", "报告生成"))
 from UI.toolui import ConnectButton
-from pyqtgraph import GraphicsLayoutWidget
@@ -1,23 +1,75 @@
+import time
+
+_START_TIME = time.perf_counter()  # 进程启动计时起点，用于 --profile-startup
+
+import argparse
 import PyQt5
+from PyQt5.QtCore import QEvent, QTimer
 from PyQt5.QtWidgets import QMainWindow
 
 import sys
 
-from Module.Tcp import TcpLogic
 from UI.MainWindow import MainWindowLogic
-from Module.DataProcessor import DataProcessor
+
+
+class StartupProfiler:
+    """启动耗时统计，记录首次绘制和开始监听的时间点"""
+
+    def __init__(self):
+        self.marks = {}
+
+    def mark(self, name: str):
+        """记录时间点(只记录首次)，两个时间点都到齐后输出报告"""
+        if name in self.marks:
+            return
+        self.marks[name] = time.perf_counter() - _START_TIME
+        # 监听成功或失败都算结束，保证报告总会输出
+        if 'first_paint' in self.marks and self.marks.keys() & {'listening', 'listen_failed'}:
+            self.report()
+
+    def report(self):
+        """输出启动耗时报告"""
+        print("[启动耗时]")
+        for name, elapsed in sorted(self.marks.items(), key=lambda item: item[1]):
+            print(f"  {name}: {elapsed * 1000:.1f} ms")
+        if 'listen_failed' in self.marks:
+            print("  监听启动失败，未能统计 listening 耗时")
+
 
 class MainWindow(MainWindowLogic):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, profiler=None, server_config=None):
         # 只继承 MainWindowLogic，使用组合方式包含 TcpLogic
         MainWindowLogic.__init__(self, parent)
-        
+        self.profiler = profiler
+        self.server_config = server_config or {}  # 传给 TcpLogic.set_server_config 的参数
+        self.tcp_logic = None
+        self.data_processor = None
+        self.diagnostics = None
+
+        # 保留TCP服务端相关信号连接
+        self.link_signal.connect(self.link_signal_handler)
+        self.disconnect_signal.connect(self.disconnect_signal_handler)
+
+        # 诊断菜单信号
+        self.profile_signal.connect(self.profile_signal_handler)
+        self.snapshot_signal.connect(self.snapshot_signal_handler)
+
+        # 捕获首次绘制，之后再创建网络与数据处理模块
+        self.installEventFilter(self)
+
+    def _init_subsystems(self):
+        """首次绘制完成后再创建网络与数据处理模块(及其线程)，缩短首次绘制时间"""
+        if self.tcp_logic:
+            return
+        from Module.Tcp import TcpLogic
+        from Module.DataProcessor import DataProcessor
+
         # 创建 TcpLogic 实例
         self.tcp_logic = TcpLogic()
-        
+        self.tcp_logic.set_server_config(**self.server_config)
+
         # 创建数据处理器 实例
         self.data_processor = DataProcessor(self)
-        
 
         # 连接 TcpLogic 的信号到本类的槽函数
         self.tcp_logic.tcp_signal_msg.connect(self.msg_write)
@@ -27,20 +79,62 @@ class MainWindow(MainWindowLogic):
         self.data_processor.text_signal.connect(self.msg_write)
         self.data_processor.waveform_signal.connect(self.update_waveform)
 
-        
-        # 保留TCP服务端相关信号连接
-        self.link_signal.connect(self.link_signal_handler)
-        self.disconnect_signal.connect(self.disconnect_signal_handler)
+    def _init_diagnostics(self):
+        """首次使用诊断功能时再创建诊断工具"""
+        if self.diagnostics:
+            return
+        self._init_subsystems()
+        from Module.Diagnostics import Diagnostics
+
+        self.diagnostics = Diagnostics(parent=self)
+        self.diagnostics.register_thread('process', self.data_processor.process_thread)
+        self.diagnostics.msg_signal.connect(self.msg_write)
+        self.diagnostics.profile_failed.connect(self.uncheck_profile_action)
 
-        
+    def profile_signal_handler(self, target, mode, enabled):
+        # 处理性能分析启停
+        self._init_diagnostics()
+        self.diagnostics.set_profile(target, mode, enabled)
 
+    def snapshot_signal_handler(self, take):
+        # 处理内存快照
+        self._init_diagnostics()
+        if take:
+            self.diagnostics.take_snapshot()
+        else:
+            self.diagnostics.stop_tracemalloc()
+
+    def closeEvent(self, event):
+        """退出前停止诊断和数据处理线程，保证分析结果写入文件"""
+        if self.diagnostics:
+            self.diagnostics.close()
+        if self.data_processor:
+            # 处理线程退出前会执行一次诊断钩子，保存其 cProfile 结果
+            self.data_processor.close()
+        super().closeEvent(event)
+
+    def eventFilter(self, obj, event):
+        """捕获首次绘制，排队初始化其余模块，--profile-startup 模式下同时记录耗时"""
+        if obj is self and event.type() == QEvent.Paint:
+            self.removeEventFilter(self)
+            # 排队到本次绘制结束之后执行
+            QTimer.singleShot(0, self._init_subsystems)
+            if self.profiler:
+                self.profiler.mark('first_paint')
+                # 启动耗时统计模式下自动开始监听
+                QTimer.singleShot(0, self.start_listening)
+        return super().eventFilter(obj, event)
 
     def link_signal_handler(self, port):
         # 处理TCP服务端启动
+        self._init_subsystems()
         self.tcp_logic.tcp_server_start(port)
+        if self.profiler:
+            listening = self.tcp_logic.link_flag == self.tcp_logic.ServerTCP
+            self.profiler.mark('listening' if listening else 'listen_failed')
 
     def disconnect_signal_handler(self):
-        if self.tcp_logic.link_flag == self.tcp_logic.ServerTCP:
+        if self.tcp_logic and self.tcp_logic.link_flag == self.tcp_logic.ServerTCP:
             self.tcp_logic.tcp_close()
 
     def run(self):
@@ -51,7 +145,20 @@ class MainWindow(MainWindowLogic):
 
 # 主程序入口
 if __name__ == "__main__":
-    app = PyQt5.QtWidgets.QApplication(sys.argv)
-    ui = MainWindow()
+    parser = argparse.ArgumentParser(description="多客户端TCP服务端")
+    parser.add_argument('--profile-startup', action='store_true', help="输出启动耗时")
+    parser.add_argument('--max-clients', type=int, default=0, help="最大客户端数，0 表示不限制")
+    parser.add_argument('--accept-rate', type=int, default=0, help="每秒最多接受的连接数，0 表示不限制")
+    parser.add_argument('--idle-timeout', type=float, default=0, help="空闲超时(秒)，0 表示不回收")
+    parser.add_argument('--read-buffer-size', type=int, default=0,
+                        help="每个连接的接收缓冲区大小(字节)，0 表示保持系统默认")
+    # 其余参数交给 Qt 处理
+    args, qt_argv = parser.parse_known_args()
+
+    app = PyQt5.QtWidgets.QApplication(sys.argv[:1] + qt_argv)
+    ui = MainWindow(profiler=StartupProfiler() if args.profile_startup else None,
+                    server_config=dict(max_clients=args.max_clients, accept_rate=args.accept_rate,
+                                       idle_timeout=args.idle_timeout,
+                                       read_buffer_size=args.read_buffer_size))
     ui.run()  # ui就会显示出来
     sys.exit(app.exec_())
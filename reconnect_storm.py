@@ -0,0 +1,107 @@
+"""
+重连风暴测试脚本 - 模拟大量设备在网络抖动后同时重连
+用法：
+1. 启动无界面服务端：python reconnect_storm.py serve --port 1347 --max-clients 400 --accept-rate 200
+   (也可以直接运行 main.py 并在界面中启动监听)
+2. 发起重连风暴：python reconnect_storm.py storm --port 1347 --clients 500 --rounds 3
+客户端侧输出每轮连接耗时的统计结果，服务端侧输出合并后的连接日志
+"""
+
+import argparse
+import socket
+import struct
+import sys
+import threading
+import time
+
+
+def _waveform_packet(value: float) -> bytes:
+    """生成一个波形数据包，格式与 DataProcessor._process_waveform 一致"""
+    return b'\x62\x74' + struct.pack('<I', int(abs(value) * 10000))
+
+
+def _client_once(host, port, timeout, payload, results, index):
+    """
+    单个客户端：连接、发送一包数据后断开
+    :param results: 结果列表，记录连接耗时(秒)，失败时记录 None
+    """
+    start = time.perf_counter()
+    try:
+        with socket.create_connection((host, port), timeout=timeout) as s:
+            results[index] = time.perf_counter() - start
+            if payload:
+                s.sendall(payload)
+    except OSError:
+        results[index] = None
+
+
+def _percentile(values, pct):
+    """计算百分位数"""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run_storm(args):
+    """发起多轮重连风暴并输出统计"""
+    payload = b''.join(_waveform_packet(i / 10) for i in range(args.packets))
+    for round_index in range(args.rounds):
+        results = [None] * args.clients
+        threads = [threading.Thread(target=_client_once,
+                                    args=(args.host, args.port, args.timeout, payload, results, i))
+                   for i in range(args.clients)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+
+        ok = [r for r in results if r is not None]
+        print(f"第{round_index + 1}轮: 成功{len(ok)}/{args.clients} 总耗时{elapsed:.3f}s "
+              f"连接耗时 p50={_percentile(ok, 50) * 1000:.1f}ms "
+              f"p99={_percentile(ok, 99) * 1000:.1f}ms "
+              f"max={max(ok, default=0) * 1000:.1f}ms")
+        time.sleep(args.interval)
+
+
+def run_server(args):
+    """启动无界面 TcpLogic 服务端，日志输出到终端"""
+    from PyQt5.QtCore import QCoreApplication
+    from Module.Tcp import TcpLogic
+
+    app = QCoreApplication(sys.argv)
+    tcp_logic = TcpLogic()
+    tcp_logic.set_server_config(max_clients=args.max_clients, accept_rate=args.accept_rate,
+                                idle_timeout=args.idle_timeout, read_buffer_size=args.read_buffer_size)
+    tcp_logic.tcp_signal_msg.connect(lambda msg: print(time.strftime("[%H:%M:%S]"), msg, end=''))
+    tcp_logic.tcp_server_start(args.port)
+    sys.exit(app.exec_())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="TCP服务端重连风暴测试")
+    sub = parser.add_subparsers(dest='mode', required=True)
+
+    serve = sub.add_parser('serve', help="启动无界面服务端")
+    serve.add_argument('--port', type=int, default=1347)
+    serve.add_argument('--max-clients', type=int, default=0)
+    serve.add_argument('--accept-rate', type=int, default=0)
+    serve.add_argument('--idle-timeout', type=float, default=0)
+    serve.add_argument('--read-buffer-size', type=int, default=0)
+
+    storm = sub.add_parser('storm', help="发起重连风暴")
+    storm.add_argument('--host', default='127.0.0.1')
+    storm.add_argument('--port', type=int, default=1347)
+    storm.add_argument('--clients', type=int, default=500)
+    storm.add_argument('--rounds', type=int, default=3)
+    storm.add_argument('--packets', type=int, default=10, help="每个客户端发送的波形点数")
+    storm.add_argument('--timeout', type=float, default=10.0)
+    storm.add_argument('--interval', type=float, default=1.0, help="每轮之间的间隔(秒)")
+
+    cli_args = parser.parse_args()
+    if cli_args.mode == 'serve':
+        run_server(cli_args)
+    else:
+        run_storm(cli_args)